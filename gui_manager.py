@@ -19,21 +19,36 @@ Author: AI Assistant
 
 import os
 import sys
+import concurrent.futures
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from tkcalendar import DateEntry  # You might need to install this: pip install tkcalendar
 import datetime
-from PIL import Image, ImageTk  # You might need to install this: pip install pillow
-import matplotlib.pyplot as plt  # You might need to install this: pip install matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd  # You might need to install this: pip install pandas
+import threading
+import time
 
 # Import from inventory_manager.py
 from inventory_manager import InventoryDatabase
 
+# Matplotlib is only needed for the dashboard charts, so it is imported on
+# first use by _load_matplotlib() rather than at module import time
+Figure = None
+FigureCanvasTkAgg = None
+
+def _load_matplotlib():
+    """Import the Matplotlib classes used by the dashboard charts."""
+    global Figure, FigureCanvasTkAgg
+    if Figure is None:
+        import matplotlib  # You might need to install this: pip install matplotlib
+        matplotlib.use("Agg")  # FigureCanvasTkAgg renders through Agg; skip the interactive backend
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
 class InventoryManagementSystem:
     """Main application class for the Inventory Management System GUI."""
     
+    # Number of product rows inserted into the products treeview at a time
+    PRODUCT_PAGE_SIZE = 200
+    
     def __init__(self, master, db_manager):
         """Initialize the application GUI.
         
@@ -44,6 +59,29 @@ class InventoryManagementSystem:
         self.master = master
         self.db = db_manager
         
+        # Cached dashboard query results, keyed by name: (timestamp, value)
+        self._dashboard_cache = {}
+        
+        # Set while a restore runs on a worker thread. The restore holds the
+        # database write lock until it finishes, so writes are refused meanwhile
+        self._restoring = False
+        
+        # Worker threads for database reads that can overlap with Tk work
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        
+        # Content screens are built on first visit, then hidden and re-shown:
+        # name -> (status message, builder, refresher)
+        self._content_builders = {
+            "dashboard": ("Dashboard", self._build_dashboard, self._refresh_dashboard),
+            "products": ("Products Management", self._build_products, self._refresh_products),
+            "inventory": ("Inventory Management", self._build_inventory, None),
+            "suppliers": ("Supplier Management", self._build_suppliers, None),
+            "billing": ("Sales & Billing", self._build_billing, None),
+            "settings": ("Settings", self._build_settings, None),
+        }
+        self._content_frames = {}
+        self._active_content = None
+        
         # Configure the main window
         self.master.title("Inventory Management System")
         self.master.geometry("1200x700")
@@ -57,6 +95,7 @@ class InventoryManagementSystem:
             pass
         
         # Create main UI components
+        self._configure_styles()
         self.create_menu()
         self.create_main_frame()
         self.create_sidebar()
@@ -65,6 +104,12 @@ class InventoryManagementSystem:
         # Show dashboard by default
         self.show_dashboard()
     
+    def _configure_styles(self):
+        """Configure the ttk styles used across the application once."""
+        style = ttk.Style()
+        style.configure("Sidebar.TButton", font=("Arial", 11), padding=10, width=20)
+        style.configure("Card.TFrame", background="#ffffff", relief=tk.RAISED)
+    
     def create_menu(self):
         """Create the application main menu bar."""
         self.menu_bar = tk.Menu(self.master)
@@ -104,7 +149,7 @@ class InventoryManagementSystem:
         self.main_frame = ttk.Frame(self.master, padding="10")
         self.main_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
-        # Content frame will be replaced based on which section is active
+        # Content frame holds one cached frame per section; only the active one is packed
         self.content_frame = ttk.Frame(self.main_frame)
         self.content_frame.pack(fill=tk.BOTH, expand=True)
     
@@ -114,56 +159,25 @@ class InventoryManagementSystem:
         self.sidebar = ttk.Frame(self.master, width=200, padding="10")
         self.sidebar.pack(side=tk.LEFT, fill=tk.Y)
         
-        # Style for the buttons
-        style = ttk.Style()
-        style.configure("Sidebar.TButton", font=("Arial", 11), padding=10, width=20)
-        
         # Add sidebar buttons
         ttk.Label(self.sidebar, text="NAVIGATION", font=("Arial", 12, "bold")).pack(pady=(0, 10))
         
         self.sidebar_buttons = []
         
-        # Dashboard button
-        dashboard_btn = ttk.Button(self.sidebar, text="Dashboard", style="Sidebar.TButton", 
-                                  command=self.show_dashboard)
-        dashboard_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(dashboard_btn)
-        
-        # Products button
-        products_btn = ttk.Button(self.sidebar, text="Products", style="Sidebar.TButton", 
-                                 command=self.show_products)
-        products_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(products_btn)
-        
-        # Inventory button
-        inventory_btn = ttk.Button(self.sidebar, text="Inventory", style="Sidebar.TButton", 
-                                  command=self.show_inventory)
-        inventory_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(inventory_btn)
-        
-        # Suppliers button
-        suppliers_btn = ttk.Button(self.sidebar, text="Suppliers", style="Sidebar.TButton", 
-                                  command=self.show_suppliers)
-        suppliers_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(suppliers_btn)
-        
-        # Reports button
-        reports_btn = ttk.Button(self.sidebar, text="Reports", style="Sidebar.TButton", 
-                                command=lambda: self.show_reports("default"))
-        reports_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(reports_btn)
-        
-        # Sales & Billing button
-        billing_btn = ttk.Button(self.sidebar, text="Sales & Billing", style="Sidebar.TButton", 
-                               command=self.show_billing)
-        billing_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(billing_btn)
-        
-        # Settings button
-        settings_btn = ttk.Button(self.sidebar, text="Settings", style="Sidebar.TButton", 
-                                command=self.show_settings)
-        settings_btn.pack(fill=tk.X, pady=5)
-        self.sidebar_buttons.append(settings_btn)
+        sidebar_spec = (
+            ("Dashboard", self.show_dashboard),
+            ("Products", self.show_products),
+            ("Inventory", self.show_inventory),
+            ("Suppliers", self.show_suppliers),
+            ("Reports", lambda: self.show_reports("default")),
+            ("Sales & Billing", self.show_billing),
+            ("Settings", self.show_settings),
+        )
+        
+        for text, command in sidebar_spec:
+            button = ttk.Button(self.sidebar, text=text, style="Sidebar.TButton", command=command)
+            button.pack(fill=tk.X, pady=5)
+            self.sidebar_buttons.append(button)
         
         # Add logo or branding at the bottom
         ttk.Separator(self.sidebar, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
@@ -178,21 +192,102 @@ class InventoryManagementSystem:
         self.status_label.pack(side=tk.LEFT)
         
         # Display current date and time
-        self.time_label = ttk.Label(self.status_bar, padding=(5, 2))
+        self._time_var = tk.StringVar()
+        self._last_time_str = None
+        self.time_label = ttk.Label(self.status_bar, textvariable=self._time_var, padding=(5, 2))
         self.time_label.pack(side=tk.RIGHT)
         self.update_time()
     
+    def create_dashboard_charts(self, parent):
+        """Create the dashboard chart canvases once so later visits only redraw data.
+        
+        Args:
+            parent: The dashboard frame to build the charts in
+        """
+        _load_matplotlib()
+        
+        self.charts_frame = ttk.Frame(parent)
+        
+        # Create two chart frames
+        left_chart_frame = ttk.Frame(self.charts_frame)
+        left_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+        
+        right_chart_frame = ttk.Frame(self.charts_frame)
+        right_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+        
+        # Product categories chart (left)
+        ttk.Label(left_chart_frame, text="Products by Category", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
+        
+        # Figure() keeps the chart out of pyplot's global figure registry
+        self._cat_fig = Figure(figsize=(5, 4))
+        self._cat_ax = self._cat_fig.add_subplot(111)
+        self._cat_canvas = FigureCanvasTkAgg(self._cat_fig, left_chart_frame)
+        self._cat_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Stock levels chart (right)
+        ttk.Label(right_chart_frame, text="Stock Levels", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
+        
+        self._stock_fig = Figure(figsize=(5, 4))
+        self._stock_ax = self._stock_fig.add_subplot(111)
+        self._stock_canvas = FigureCanvasTkAgg(self._stock_fig, right_chart_frame)
+        self._stock_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # The bars are animated so they can be blitted over a cached background
+        self._stock_bars = []
+        self._stock_bg = None
+        self._stock_canvas.mpl_connect('draw_event', self._on_stock_chart_draw)
+        
+        # Data currently drawn on each chart
+        self._drawn_category_counts = None
+        self._drawn_top_products = None
+        
+        # Shown in place of the charts when they fail to load
+        self._charts_error_label = ttk.Label(self.charts_frame)
+    
     def update_time(self):
         """Update the time display in the status bar."""
-        current_time = datetime.datetime.now().strftime("%d-%b-%Y %H:%M:%S")
-        self.time_label.config(text=current_time)
-        # Update every second
-        self.master.after(1000, self.update_time)
+        now = datetime.datetime.now()
+        current_time = now.strftime("%d-%b-%Y %H:%M:%S")
+        if current_time != self._last_time_str:
+            self._time_var.set(current_time)
+            self._last_time_str = current_time
+        # Schedule the next update just after the next wall-clock second
+        self.master.after(1000 - now.microsecond // 1000, self.update_time)
     
-    def clear_content_frame(self):
-        """Clear the content frame to prepare for new content."""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+    def _get_cached(self, key, loader, ttl=30):
+        """Return a cached dashboard value, reloading it when stale.
+        
+        Args:
+            key (str): Cache key
+            loader (callable): Function returning a fresh value
+            ttl (float, optional): Seconds before the cached value expires
+        
+        Returns:
+            The cached or freshly loaded value
+        """
+        now = time.monotonic()
+        entry = self._dashboard_cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        
+        value = loader()
+        self._dashboard_cache[key] = (now, value)
+        return value
+    
+    def _get_categories(self):
+        """Return category names for the product dialogs.
+        
+        The database keeps the category list cached, so this does not query
+        SQLite unless the categories have changed.
+        
+        Returns:
+            tuple: Category names
+        """
+        return tuple(cat['name'] for cat in self.db.get_all_categories())
+    
+    def _invalidate_dashboard_cache(self):
+        """Drop cached dashboard data after the products change."""
+        self._dashboard_cache.clear()
     
     def update_status(self, message):
         """Update the status bar message.
@@ -203,149 +298,197 @@ class InventoryManagementSystem:
         self.status_label.config(text=message)
     
     # Navigation methods
+    def _show(self, name):
+        """Show a content section, building its frame on first visit.
+        
+        Args:
+            name (str): Key of the section in self._content_builders
+        """
+        status, builder, refresher = self._content_builders[name]
+        self.update_status(status)
+        
+        frame = self._content_frames.get(name)
+        if frame is None:
+            frame = ttk.Frame(self.content_frame)
+            builder(frame)
+            self._content_frames[name] = frame
+        
+        if self._active_content is not frame:
+            if self._active_content is not None:
+                self._active_content.pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self._active_content = frame
+        
+        if refresher is not None:
+            refresher()
+    
     def show_dashboard(self):
         """Display the dashboard screen."""
-        self.clear_content_frame()
-        self.update_status("Dashboard")
-        
+        self._show("dashboard")
+    
+    def _build_dashboard(self, frame):
+        """Build the dashboard widgets; data is filled in by _refresh_dashboard."""
         # Dashboard title
-        title_label = ttk.Label(self.content_frame, text="Dashboard", font=("Arial", 16, "bold"))
+        title_label = ttk.Label(frame, text="Dashboard", font=("Arial", 16, "bold"))
         title_label.pack(pady=10, anchor=tk.W)
         
         # Create dashboard content with multiple frames
-        top_frame = ttk.Frame(self.content_frame)
+        top_frame = ttk.Frame(frame)
         top_frame.pack(fill=tk.X, expand=False, pady=10)
         
-        # Summary cards
-        card_style = ttk.Style()
-        card_style.configure("Card.TFrame", background="#ffffff", relief=tk.RAISED)
-        
         # Total products card
         products_card = ttk.Frame(top_frame, style="Card.TFrame", padding=15)
         products_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
         
-        # Get product count from database
-        product_count = len(self.db.get_all_products())
-        
         ttk.Label(products_card, text="Total Products", font=("Arial", 12, "bold")).pack(anchor=tk.W)
-        ttk.Label(products_card, text=str(product_count), font=("Arial", 24)).pack(pady=10)
+        self._product_count_label = ttk.Label(products_card, font=("Arial", 24))
+        self._product_count_label.pack(pady=10)
         
         # Low stock card
         lowstock_card = ttk.Frame(top_frame, style="Card.TFrame", padding=15)
         lowstock_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
         
-        # Get low stock count
-        low_stock_count = len(self.db.get_low_stock_products())
-        
         ttk.Label(lowstock_card, text="Low Stock Items", font=("Arial", 12, "bold")).pack(anchor=tk.W)
-        ttk.Label(lowstock_card, text=str(low_stock_count), font=("Arial", 24)).pack(pady=10)
+        self._low_stock_count_label = ttk.Label(lowstock_card, font=("Arial", 24))
+        self._low_stock_count_label.pack(pady=10)
         
         # Charts frame
-        charts_frame = ttk.Frame(self.content_frame)
-        charts_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        # For demonstration, create a simple chart
-        try:
-            # Get all products
-            products = self.db.get_all_products()
-            
-            # Create two chart frames
-            left_chart_frame = ttk.Frame(charts_frame)
-            left_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-            
-            right_chart_frame = ttk.Frame(charts_frame)
-            right_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-            
-            # Product categories chart (left)
-            ttk.Label(left_chart_frame, text="Products by Category", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
-            
-            # Group by category (simplified for demo)
-            categories = {}
-            for product in products:
-                category = product.get('category', 'Uncategorized')
-                if category in categories:
-                    categories[category] += 1
-                else:
-                    categories[category] = 1
-            
-            fig1, ax1 = plt.subplots(figsize=(5, 4))
-            ax1.pie(categories.values(), labels=categories.keys(), autopct='%1.1f%%', startangle=90)
-            ax1.axis('equal')
-            
-            canvas1 = FigureCanvasTkAgg(fig1, left_chart_frame)
-            canvas1.draw()
-            canvas1.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-            # Stock levels chart (right)
-            ttk.Label(right_chart_frame, text="Stock Levels", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
-            
-            # Take top 5 products by stock level
-            products.sort(key=lambda x: x.get('quantity', 0), reverse=True)
-            top_products = products[:5]
-            
-            fig2, ax2 = plt.subplots(figsize=(5, 4))
-            ax2.bar([p.get('name', 'Unknown')[:10] for p in top_products], 
-                   [p.get('quantity', 0) for p in top_products])
-            ax2.set_xlabel('Products')
-            ax2.set_ylabel('Quantity')
-            ax2.set_title('Top 5 Products by Stock Level')
-            plt.xticks(rotation=45)
-            
-            canvas2 = FigureCanvasTkAgg(fig2, right_chart_frame)
-            canvas2.draw()
-            canvas2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-        except Exception as e:
-            ttk.Label(charts_frame, text=f"Error loading charts: {e}").pack()
+        self.create_dashboard_charts(frame)
+        self.charts_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # Recent activities section
-        activities_frame = ttk.Frame(self.content_frame)
+        activities_frame = ttk.Frame(frame)
         activities_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         ttk.Label(activities_frame, text="Recent Activities", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
         
         # Create a treeview for recent transactions
         columns = ('date', 'type', 'product', 'quantity')
-        tree = ttk.Treeview(activities_frame, columns=columns, show='headings')
+        self.activities_tree = ttk.Treeview(activities_frame, columns=columns, show='headings')
         
         # Define headings
-        tree.heading('date', text='Date')
-        tree.heading('type', text='Transaction Type')
-        tree.heading('product', text='Product')
-        tree.heading('quantity', text='Quantity')
+        self.activities_tree.heading('date', text='Date')
+        self.activities_tree.heading('type', text='Transaction Type')
+        self.activities_tree.heading('product', text='Product')
+        self.activities_tree.heading('quantity', text='Quantity')
         
         # Add scrollbar
-        scrollbar = ttk.Scrollbar(activities_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
+        scrollbar = ttk.Scrollbar(activities_frame, orient=tk.VERTICAL, command=self.activities_tree.yview)
+        self.activities_tree.configure(yscroll=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Sample data (in a real app, this would come from the database)
+        self.activities_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    def _refresh_dashboard(self):
+        """Fill the dashboard widgets with current data."""
+        # Start the independent dashboard queries on the I/O pool so they run
+        # while the Tk thread fills in the activities list
+        pool = self._io_pool
+        product_count_future = pool.submit(self._get_cached, "product_count", self.db.count_products)
+        low_stock_count_future = pool.submit(self._get_cached, "low_stock_count", self.db.count_low_stock)
+        category_future = pool.submit(self._get_cached, "category_counts", self.db.get_category_counts)
+        top_products_future = pool.submit(
+            self._get_cached, "top_products", lambda: self.db.get_top_products_by_quantity(5))
+        
+        # Sample data (in a real app, this would come from the database with
+        # timestamps already formatted by SQLite's strftime)
+        now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
         sample_data = [
-            (datetime.datetime.now().strftime("%Y-%m-%d %H:%M"), "Purchase", "Laptop", "5"),
-            (datetime.datetime.now().strftime("%Y-%m-%d %H:%M"), "Sale", "Mobile Phone", "2"),
-            (datetime.datetime.now().strftime("%Y-%m-%d %H:%M"), "Stock Update", "Headphones", "10"),
+            (now_str, "Purchase", "Laptop", "5"),
+            (now_str, "Sale", "Mobile Phone", "2"),
+            (now_str, "Stock Update", "Headphones", "10"),
         ]
         
         # Insert the data
+        self.activities_tree.delete(*self.activities_tree.get_children())
         for item in sample_data:
-            tree.insert('', tk.END, values=item)
+            self.activities_tree.insert('', tk.END, values=item)
+        
+        # Get product count from database
+        product_count = product_count_future.result()
+        self._product_count_label.config(text=str(product_count))
+        
+        # Get low stock count
+        low_stock_count = low_stock_count_future.result()
+        self._low_stock_count_label.config(text=str(low_stock_count))
+        
+        try:
+            self.update_dashboard_charts(category_future.result(), top_products_future.result())
+            self._charts_error_label.pack_forget()
+        except Exception as e:
+            self._charts_error_label.config(text=f"Error loading charts: {e}")
+            self._charts_error_label.pack()
+    
+    def update_dashboard_charts(self, category_counts, top_products):
+        """Redraw the dashboard charts, touching only the artists whose data changed.
+        
+        Args:
+            category_counts (list): (category_name, product_count) rows
+            top_products (list): (product_name, quantity) rows, highest stock first
+        """
+        if category_counts != self._drawn_category_counts:
+            self._cat_ax.clear()
+            self._cat_ax.pie([count for _, count in category_counts],
+                             labels=[name for name, _ in category_counts],
+                             autopct='%1.1f%%', startangle=90)
+            self._cat_ax.axis('equal')
+            self._cat_canvas.draw_idle()
+            self._drawn_category_counts = category_counts
+        
+        if top_products == self._drawn_top_products:
+            return
+        
+        names = [name[:10] for name, _ in top_products]
+        quantities = [quantity for _, quantity in top_products]
+        drawn_names = [name[:10] for name, _ in self._drawn_top_products or []]
+        
+        if (self._stock_bg is not None and names == drawn_names
+                and max(quantities, default=0) <= self._stock_ax.get_ylim()[1]):
+            # Same bars and axis range: blit the new heights over the background
+            for bar, quantity in zip(self._stock_bars, quantities):
+                bar.set_height(quantity)
+            self._stock_canvas.restore_region(self._stock_bg)
+            self._draw_stock_bars()
+            self._stock_canvas.blit(self._stock_ax.bbox)
+            self._drawn_top_products = top_products
+            return
+        
+        # Bar labels or axis range changed; the next draw_event recaptures the background
+        self._stock_bg = None
+        self._stock_ax.clear()
+        self._stock_bars = self._stock_ax.bar(names, quantities, animated=True)
+        self._stock_ax.set_xlabel('Products')
+        self._stock_ax.set_ylabel('Quantity')
+        self._stock_ax.set_title('Top 5 Products by Stock Level')
+        self._stock_ax.tick_params(axis='x', rotation=45)
+        self._stock_canvas.draw_idle()
+        self._drawn_top_products = top_products
+    
+    def _on_stock_chart_draw(self, event):
+        """Capture the stock chart background after a full draw and paint the bars."""
+        self._stock_bg = self._stock_canvas.copy_from_bbox(self._stock_ax.bbox)
+        self._draw_stock_bars()
+    
+    def _draw_stock_bars(self):
+        """Draw the animated stock bars onto the canvas renderer."""
+        for bar in self._stock_bars:
+            self._stock_ax.draw_artist(bar)
     
     def show_products(self):
         """Display the products screen."""
-        self.clear_content_frame()
-        self.update_status("Products Management")
-        
+        self._show("products")
+    
+    def _build_products(self, frame):
+        """Build the products screen; rows are loaded by load_products."""
         # Products title
-        title_label = ttk.Label(self.content_frame, text="Products Management", font=("Arial", 16, "bold"))
+        title_label = ttk.Label(frame, text="Products Management", font=("Arial", 16, "bold"))
         title_label.pack(pady=10, anchor=tk.W)
         
         # Add product button
-        add_button = ttk.Button(self.content_frame, text="Add New Product", command=self.add_product)
+        add_button = ttk.Button(frame, text="Add New Product", command=self.add_product)
         add_button.pack(anchor=tk.W, pady=10)
         
         # Products table
-        table_frame = ttk.Frame(self.content_frame)
+        table_frame = ttk.Frame(frame)
         table_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # Create Treeview with scrollbar
@@ -370,61 +513,66 @@ class InventoryManagementSystem:
         self.products_tree.column('reorder_level', width=100)
         self.products_tree.column('gst_rate', width=100)
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.products_tree.yview)
-        self.products_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Add scrollbar; scrolling near the end inserts the next page of rows
+        self._products_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.products_tree.yview)
+        self.products_tree.configure(yscroll=self._on_products_scroll)
+        self._products_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.products_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
+        # Product rows fetched by load_products and how many are in the tree so far
+        self._product_rows = []
+        self._product_rows_loaded = 0
+        self._product_page_pending = False
+        
+        # Set when products change, so re-entering the screen only reloads when needed
+        self._products_stale = True
+        
         # Bind event for double click
         self.products_tree.bind("<Double-1>", self.edit_product)
-        
-        # Load products from database
-        self.load_products()
     
     def show_inventory(self):
         """Display the inventory screen."""
-        self.clear_content_frame()
-        self.update_status("Inventory Management")
-        
-        # Placeholder implementation
-        title_label = ttk.Label(self.content_frame, text="Inventory Management", font=("Arial", 16, "bold"))
-        title_label.pack(pady=10, anchor=tk.W)
-        
-        ttk.Label(self.content_frame, text="This section will include inventory reports, stock adjustment, and inventory history.").pack(pady=20)
+        self._show("inventory")
+    
+    def _build_inventory(self, frame):
+        """Build the inventory screen."""
+        self._build_placeholder(frame, "Inventory Management",
+                                "This section will include inventory reports, stock adjustment, and inventory history.")
     
     def show_suppliers(self):
         """Display the suppliers screen."""
-        self.clear_content_frame()
-        self.update_status("Supplier Management")
-        
-        # Placeholder implementation
-        title_label = ttk.Label(self.content_frame, text="Supplier Management", font=("Arial", 16, "bold"))
-        title_label.pack(pady=10, anchor=tk.W)
-        
-        ttk.Label(self.content_frame, text="This section will include supplier information, purchase orders, and supplier contacts.").pack(pady=20)
+        self._show("suppliers")
+    
+    def _build_suppliers(self, frame):
+        """Build the suppliers screen."""
+        self._build_placeholder(frame, "Supplier Management",
+                                "This section will include supplier information, purchase orders, and supplier contacts.")
     
     def show_billing(self):
         """Display the sales and billing screen."""
-        self.clear_content_frame()
-        self.update_status("Sales & Billing")
-        
-        # Placeholder implementation
-        title_label = ttk.Label(self.content_frame, text="Sales & Billing", font=("Arial", 16, "bold"))
-        title_label.pack(pady=10, anchor=tk.W)
-        
-        ttk.Label(self.content_frame, text="This section will include sales entry, GST invoice generation, and sales history.").pack(pady=20)
+        self._show("billing")
+    
+    def _build_billing(self, frame):
+        """Build the sales and billing screen."""
+        self._build_placeholder(frame, "Sales & Billing",
+                                "This section will include sales entry, GST invoice generation, and sales history.")
     
     def show_settings(self):
         """Display the settings screen."""
-        self.clear_content_frame()
-        self.update_status("Settings")
-        
+        self._show("settings")
+    
+    def _build_settings(self, frame):
+        """Build the settings screen."""
+        self._build_placeholder(frame, "Settings",
+                                "This section will include application settings, user preferences, and configuration options.")
+    
+    def _build_placeholder(self, frame, title, description):
+        """Build a placeholder screen for a section that is not implemented yet."""
         # Placeholder implementation
-        title_label = ttk.Label(self.content_frame, text="Settings", font=("Arial", 16, "bold"))
+        title_label = ttk.Label(frame, text=title, font=("Arial", 16, "bold"))
         title_label.pack(pady=10, anchor=tk.W)
         
-        ttk.Label(self.content_frame, text="This section will include application settings, user preferences, and configuration options.").pack(pady=20)
+        ttk.Label(frame, text=description).pack(pady=20)
     
     def backup_database(self):
         """Backup the database to a file"""
@@ -434,29 +582,70 @@ class InventoryManagementSystem:
             title="Backup Database"
         )
         if backup_file:
-            try:
-                import shutil
-                shutil.copy2('inventory.db', backup_file)
-                messagebox.showinfo("Success", "Database backup created successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create backup: {e}")
+            def on_done(error):
+                if error is None:
+                    messagebox.showinfo("Success", "Database backup created successfully!")
+                else:
+                    messagebox.showerror("Error", f"Failed to create backup: {error}")
+            
+            self.run_in_background("Backing up database...",
+                                   lambda: self.db.backup_to(backup_file), on_done)
 
     def restore_database(self):
         """Restore the database from a backup file"""
+        if self._restoring:
+            messagebox.showinfo("Restore", "A restore is already in progress")
+            return
         backup_file = filedialog.askopenfilename(
             filetypes=[("Database files", "*.db"), ("All files", "*.*")],
             title="Restore Database"
         )
         if backup_file:
+            def on_done(error):
+                self._restoring = False
+                if error is None:
+                    self._invalidate_dashboard_cache()
+                    self._products_stale = True
+                    self.show_dashboard()
+                    messagebox.showinfo("Success", "Database restored successfully!")
+                else:
+                    messagebox.showerror("Error", f"Failed to restore backup: {error}")
+            
+            self._restoring = True
+            self.run_in_background("Restoring database...",
+                                   lambda: self.db.restore_from(backup_file), on_done)
+    
+    def run_in_background(self, message, work, on_done):
+        """Run blocking work on a worker thread while the UI stays responsive.
+        
+        Args:
+            message (str): Status message to display while the work runs
+            work (callable): Function to run on the worker thread
+            on_done (callable): Called on the Tk thread with the raised exception, or None
+        """
+        previous_message = self.status_label.cget('text')
+        self.update_status(message)
+        
+        progress = ttk.Progressbar(self.status_bar, mode='indeterminate', length=120)
+        progress.pack(side=tk.RIGHT, padx=5)
+        progress.start(50)
+        
+        def finish(error):
+            progress.stop()
+            progress.destroy()
+            self.update_status(previous_message)
+            on_done(error)
+        
+        def worker():
             try:
-                self.db.close()  # Close current connection
-                import shutil
-                shutil.copy2(backup_file, 'inventory.db')
-                messagebox.showinfo("Success", "Database restored successfully!")
-                messagebox.showinfo("Restart Required", "Please restart the application to complete restoration.")
-                self.master.quit()
+                work()
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to restore backup: {e}")
+                # Tk widgets must only be touched from the main thread
+                self.master.after(0, finish, e)
+            else:
+                self.master.after(0, finish, None)
+        
+        threading.Thread(target=worker, daemon=True).start()
 
     def show_preferences(self):
         """Show preferences dialog"""
@@ -583,10 +772,10 @@ class InventoryManagementSystem:
         # Insert data
         for product in low_stock_products:
             tree.insert('', tk.END, values=(
-                product.get('id', ''),
-                product.get('name', ''),
-                product.get('quantity', 0),
-                product.get('reorder_level', 0)
+                product['id'],
+                product['name'],
+                product['quantity'],
+                product['reorder_level']
             ))
             
     def show_sales_report(self, parent_window):
@@ -618,29 +807,56 @@ class InventoryManagementSystem:
         ttk.Button(parent_window, text="GST Report", 
                 command=lambda: self.show_gst_report(parent_window)).pack(pady=5)
 
+    def _refresh_products(self):
+        """Reload the products treeview if products changed since it was last loaded"""
+        if self._products_stale:
+            self.load_products()
+    
     def load_products(self):
         """Load products into the products treeview"""
-        # Clear existing items
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-        
-        # Get products from database
-        products = self.db.get_all_products()
-        
-        # Insert products into treeview
-        for product in products:
-            self.products_tree.insert('', tk.END, values=(
-                product.get('id', ''),
-                product.get('name', ''),
-                product.get('category', ''),
-                product.get('selling_price', ''),
-                product.get('quantity', 0),
-                10,  # Default reorder level
-                product.get('gst_percentage', 18)
-            ))
+        tree = self.products_tree
+        self._products_stale = False
+        
+        # Clear existing items in a single call
+        tree.delete(*tree.get_children())
+        
+        # Get products from database; only the first page is inserted now
+        self._product_rows = self.db.get_product_list_rows()
+        self._product_rows_loaded = 0
+        
+        # Detach the tree while inserting so Tk doesn't re-layout per row
+        pack_info = tree.pack_info()
+        tree.pack_forget()
+        self._insert_product_page()
+        tree.pack(**pack_info)
+    
+    def _insert_product_page(self):
+        """Insert the next page of fetched products into the products treeview"""
+        self._product_page_pending = False
+        start = self._product_rows_loaded
+        page = self._product_rows[start:start + self.PRODUCT_PAGE_SIZE]
+        
+        # Rows arrive in the treeview's column order, so they go in as-is,
+        # keyed by product ID
+        for row in page:
+            self.products_tree.insert('', tk.END, iid=str(row[0]), values=row)
+        
+        self._product_rows_loaded = start + len(page)
+    
+    def _on_products_scroll(self, first, last):
+        """Update the products scrollbar and load more rows once 80% are in view"""
+        self._products_scrollbar.set(first, last)
+        if (float(last) > 0.8 and not self._product_page_pending
+                and self._product_rows_loaded < len(self._product_rows)):
+            # Defer the insert; Tk is still inside its scroll update here
+            self._product_page_pending = True
+            self.master.after_idle(self._insert_product_page)
 
     def add_product(self):
         """Show dialog to add a new product"""
+        if self._restoring:
+            messagebox.showinfo("Restore", "Please wait until the database restore finishes")
+            return
         dialog = tk.Toplevel(self.master)
         dialog.title("Add New Product")
         dialog.geometry("400x500")
@@ -662,8 +878,7 @@ class InventoryManagementSystem:
         # Category
         ttk.Label(details_frame, text="Category:").pack(anchor=tk.W)
         category_combo = ttk.Combobox(details_frame)
-        categories = [cat['name'] for cat in self.db.get_all_categories()]
-        category_combo['values'] = categories
+        category_combo['values'] = self._get_categories()
         category_combo.pack(fill=tk.X, pady=5)
         
         # Cost Price
@@ -718,12 +933,24 @@ class InventoryManagementSystem:
             gst_rate = float(gst_rate)
             initial_stock = int(initial_stock)
             
+            # Foreign keys are enforced, so only ids that exist may be stored
+            category_id = next((c['id'] for c in self.db.get_all_categories()
+                                if c['name'] == category), None)
+            if category_id is None:
+                messagebox.showerror("Error", "Please choose a category from the list")
+                return
+            
+            # A restore started while the dialog was open holds the write lock
+            if self._restoring:
+                messagebox.showerror("Error", "The database is being restored; please try again when it finishes")
+                return
+            
             # Add product to database
             product_id = self.db.add_product(
                 name=name,
                 description="",  # Empty description for now
-                category_id=1,  # Get proper category ID in real implementation
-                supplier_id=1,  # Get proper supplier ID in real implementation
+                category_id=category_id,
+                supplier_id=None,  # Suppliers are not captured by this dialog yet
                 cost_price=cost_price,
                 selling_price=selling_price,
                 gst_percentage=gst_rate,
@@ -732,6 +959,7 @@ class InventoryManagementSystem:
             )
             
             if product_id:
+                self._invalidate_dashboard_cache()
                 messagebox.showinfo("Success", "Product added successfully!")
                 self.load_products()  # Refresh products list
                 dialog.destroy()
@@ -747,7 +975,8 @@ class InventoryManagementSystem:
         """Handle double-click event on product in treeview"""
         item = self.products_tree.selection()[0]
         product_id = self.products_tree.item(item)['values'][0]
-        # Get product details and show edit dialog
-        product = self.db.get_product(product_id)
+        # Get product details and show edit dialog; the lite lookup skips the
+        # category and supplier joins, since the row carries their ids
+        product = self.db.get_product_lite(product_id)
         if product:
             self.show_edit_product_dialog(product)
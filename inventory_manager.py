@@ -9,128 +9,586 @@ Author: AI Assistant
 """
 
 import os
+import contextlib
+import functools
+import pathlib
+import queue
 import sqlite3
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-from datetime import datetime
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+# Statements used on every write or lookup are kept as module constants so
+# each call passes the same SQL text and hits the connection's statement cache
+_SQL_INSERT_PRODUCT = '''
+INSERT INTO products (name, description, category_id, supplier_id, 
+                      cost_price, selling_price, gst_percentage, hsn_code)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_PRODUCT_WITH_ID = '''
+INSERT INTO products (id, name, description, category_id, supplier_id, 
+                      cost_price, selling_price, gst_percentage, hsn_code)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_INVENTORY = '''
+INSERT INTO inventory (product_id, quantity, last_updated)
+VALUES (?, ?, ?)
+'''
+
+_SQL_INSERT_TRANSACTION = '''
+INSERT INTO transactions (type, product_id, quantity, notes)
+VALUES (?, ?, ?, ?)
+'''
+
+_SQL_SELECT_PRODUCT = '''
+SELECT p.id, p.name, p.description, p.category_id, c.name as category_name,
+       p.supplier_id, s.name as supplier_name, p.cost_price, p.selling_price,
+       p.gst_percentage, p.hsn_code, i.quantity
+FROM products p
+LEFT JOIN categories c ON p.category_id = c.id
+LEFT JOIN suppliers s ON p.supplier_id = s.id
+LEFT JOIN inventory i ON p.id = i.product_id
+WHERE p.id = ?
+'''
+
+# Product and stock only, for screens that do not show category or supplier names
+_SQL_SELECT_PRODUCT_LITE = '''
+SELECT p.id, p.name, p.description, p.category_id, p.supplier_id,
+       p.cost_price, p.selling_price, p.gst_percentage, p.hsn_code, i.quantity
+FROM products p
+LEFT JOIN inventory i ON p.id = i.product_id
+WHERE p.id = ?
+'''
+
+_SQL_SELECT_STOCK = "SELECT quantity FROM inventory WHERE product_id = ?"
+
+# Applies the change only if the stock stays non-negative
+_SQL_UPDATE_STOCK = '''
+UPDATE inventory 
+SET quantity = quantity + ?, last_updated = ?
+WHERE product_id = ? AND quantity + ? >= 0
+'''
+
+# Product columns update_product may set
+_PRODUCT_UPDATE_FIELDS = frozenset(('name', 'description', 'category_id', 'supplier_id', 'cost_price',
+                                    'selling_price', 'gst_percentage', 'hsn_code'))
+
+@functools.lru_cache(maxsize=32)
+def _update_product_sql(fields):
+    """Build the UPDATE statement for a sorted tuple of product columns.
+    
+    Args:
+        fields (tuple): Column names to set, in sorted order
+    
+    Returns:
+        str: SQL text, identical for every call with the same columns
+    """
+    return f"UPDATE products SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?"
+
+def _utc_timestamp():
+    """Return the current UTC time in SQLite's datetime('now') format.
+    
+    Computed once per call in Python and bound as a parameter, so the
+    statement text stays fixed and SQLite runs no date function per row.
+    """
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _synchronized(method):
+    """Serialize calls to an InventoryDatabase method on the instance lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _write_method(action, failure):
+    """Serialize a write method on the instance lock and report its SQLite errors.
+    
+    Outside bulk() an error is printed and the method returns failure.
+    Inside bulk() it is re-raised, so the enclosing transaction rolls back
+    as a whole.
+    
+    Args:
+        action (str): What the method does, for the error message
+        failure: Value returned when the write fails
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._lock:
+                try:
+                    return method(self, *args, **kwargs)
+                except sqlite3.Error as e:
+                    print(f"Error {action}: {e}")
+                    if self._bulk_depth:
+                        raise
+                    return failure
+        return wrapper
+    return decorator
 
 class InventoryDatabase:
     """Handles all database operations for the inventory management system."""
     
-    def __init__(self, db_file="inventory.db"):
+    # Pages copied per backup/restore step. Between steps of a backup, other
+    # connections may write to the database; a restore keeps the write lock
+    # on the database from its first step until the copy finishes
+    BACKUP_STEP_PAGES = 1000
+    # Read-only connections kept for list, count and report queries
+    READ_POOL_SIZE = 4
+    # Stored in PRAGMA user_version by create_tables; bump when the schema changes
+    SCHEMA_VERSION = 1
+    
+    def __init__(self, db_file="inventory.db", initialize=True):
         """Initialize database connection and create tables if they don't exist.
         
         Args:
             db_file (str): Path to SQLite database file
+            initialize (bool, optional): Run create_tables even if the database
+                already carries the current schema version
         """
         self.db_file = db_file
+        # The write connection and cursor are shared between threads; every
+        # method that touches them holds this lock
+        self._lock = threading.RLock()
         self.conn = None
         self.cursor = None
+        # Read-only connections for queries that can run beside the writer;
+        # when none can be opened, reads share the write connection instead
+        self._read_pool = queue.Queue()
+        self._read_fallback = False
+        # Guards _closed against connections being handed back during close()
+        self._pool_lock = threading.Lock()
+        self._closed = False
+        # Nesting depth of bulk() blocks; while non-zero, write methods join
+        # the bulk transaction instead of committing their own
+        self._bulk_depth = 0
+        # Product lookups are memoized per data version. Every write bumps the
+        # version in _write(), so entries from before it are never hit again
+        self._data_version = 0
+        self._product_lookup = functools.lru_cache(maxsize=256)(self._load_product)
+        # Categories rarely change; cleared by add_category and restore_from
+        self._categories_cache = None
         self.connect()
-        self.create_tables()
+        if initialize or self._schema_version() < self.SCHEMA_VERSION:
+            self.create_tables()
+        self._analyze_if_needed()
+        self._open_read_pool()
     
     def connect(self):
-        """Establish connection to SQLite database."""
+        """Establish connection to SQLite database.
+        
+        The connection is opened with check_same_thread=False, so sqlite3 skips
+        its per-call thread check. That is only safe because every use of
+        self.conn goes through the instance lock, and every read connection
+        is lent to one thread at a time by _read_conn().
+        """
         try:
-            self.conn = sqlite3.connect(self.db_file)
+            # Autocommit mode: write methods open their own transactions with
+            # _write(), so no implicit BEGIN is issued behind their back
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False,
+                                        isolation_level=None, cached_statements=256)
+            # Rows can be read by column name, without building a dict per row
+            self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
+            
+            # WAL lets reads run alongside writes and, with NORMAL sync, skips
+            # the per-commit fsync of the main file; the remaining settings give
+            # read-heavy screens a larger page cache and memory-mapped I/O
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+            self.cursor.execute("PRAGMA cache_size=-64000")
+            self.cursor.execute("PRAGMA temp_store=MEMORY")
+            self.cursor.execute("PRAGMA mmap_size=268435456")
+            self.cursor.execute("PRAGMA foreign_keys=ON")
             print(f"Connected to database: {self.db_file}")
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
     
+    def _open_read_pool(self):
+        """Open the read-only connections used by _read_conn().
+        
+        Called once the tables exist, since a read-only connection cannot
+        create the database file.
+        """
+        uri = pathlib.Path(self.db_file).resolve().as_uri() + "?mode=ro"
+        pool_size = self.READ_POOL_SIZE
+        if self.db_file == ":memory:" or sqlite3.threadsafety == 0:
+            # A single-threaded SQLite build cannot run connections on several
+            # threads at once, so everything shares the locked write connection
+            pool_size = 0
+        for _ in range(pool_size):
+            try:
+                conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                       cached_statements=256)
+            except sqlite3.Error as e:
+                print(f"Error opening read connection: {e}")
+                break
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._read_pool.put(conn)
+        
+        if self._read_pool.empty():
+            # Fall back to sharing the write connection
+            self._read_fallback = True
+    
+    @contextlib.contextmanager
+    def _read_conn(self):
+        """Borrow a read-only connection from the pool for the duration of the block.
+        
+        Each connection is used by one thread at a time, so callers need not
+        hold the write lock. Reads see committed data only, not the inside of
+        an open bulk() block.
+        
+        When no read-only connection could be opened (":memory:" databases,
+        single-threaded SQLite builds, or a failed connect), reads run on the
+        write connection under the instance lock instead. They then wait for
+        other threads' bulk() blocks to finish, but a read made inside a
+        bulk() block on the same thread sees its uncommitted rows.
+        """
+        if self._read_fallback:
+            # Only the lock guards the shared write connection. Taking a pool
+            # slot as well would invert the lock order bulk() uses
+            with self._lock:
+                yield self.conn
+            return
+        
+        conn = self._read_pool.get()
+        if conn is None:
+            # close() left this marker; pass it on to the next waiting reader
+            self._read_pool.put(None)
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._read_pool.put(conn)
+    
+    @_synchronized
     def create_tables(self):
         """Create necessary tables if they don't exist."""
-        # Categories table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY,
-            name TEXT UNIQUE NOT NULL,
-            description TEXT
-        )
-        ''')
-        
-        # Suppliers table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suppliers (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            contact_person TEXT,
-            phone TEXT,
-            email TEXT,
-            address TEXT,
-            gstin TEXT UNIQUE  -- GST Identification Number
-        )
-        ''')
-        
-        # Products table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            description TEXT,
-            category_id INTEGER,
-            supplier_id INTEGER,
-            cost_price REAL NOT NULL,
-            selling_price REAL NOT NULL,
-            gst_percentage REAL DEFAULT 18.0,
-            hsn_code TEXT,  -- Harmonized System Nomenclature code for GST
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (category_id) REFERENCES categories (id),
-            FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
-        )
-        ''')
-        
-        # Inventory table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS inventory (
-            id INTEGER PRIMARY KEY,
-            product_id INTEGER,
-            quantity INTEGER DEFAULT 0,
-            reorder_level INTEGER DEFAULT 10,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        )
-        ''')
-        
-        # Transactions table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY,
-            type TEXT CHECK (type IN ('purchase', 'sale', 'adjustment')),
-            product_id INTEGER,
-            quantity INTEGER NOT NULL,
-            transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            notes TEXT,
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        )
-        ''')
-        
-        # Initialize with default categories for Indian market
-        default_categories = [
-            (1, "Groceries & Staples", "Rice, Dal, Flour, etc."),
-            (2, "Electronics", "Mobile phones, Laptops, Appliances"),
-            (3, "Clothing", "Men's, Women's and Children's apparel"),
-            (4, "Home & Kitchen", "Utensils, Cookware"),
-            (5, "Beauty & Personal Care", "Cosmetics, Toiletries"),
-            (6, "Stationery", "Books, Office supplies"),
-            (7, "Snacks & Beverages", "Biscuits, Soft drinks"),
-            (8, "Dairy Products", "Milk, Curd, Paneer")
-        ]
-        
-        # Insert default categories if they don't exist
-        self.cursor.executemany('''
-        INSERT OR IGNORE INTO categories (id, name, description) VALUES (?, ?, ?)
-        ''', default_categories)
-        
-        self.conn.commit()
+        # The whole schema goes to SQLite in one executescript() call. The
+        # script opens the write transaction itself, because executescript()
+        # commits any transaction that is already pending
+        self._data_version += 1
+        try:
+            self.cursor.executescript('''
+            BEGIN IMMEDIATE;
+            
+            -- Categories table
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                description TEXT
+            );
+            
+            -- Suppliers table
+            CREATE TABLE IF NOT EXISTS suppliers (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                contact_person TEXT,
+                phone TEXT,
+                email TEXT,
+                address TEXT,
+                gstin TEXT UNIQUE  -- GST Identification Number
+            );
+            
+            -- Products table
+            CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT,
+                category_id INTEGER,
+                supplier_id INTEGER,
+                cost_price REAL NOT NULL,
+                selling_price REAL NOT NULL,
+                gst_percentage REAL DEFAULT 18.0,
+                hsn_code TEXT,  -- Harmonized System Nomenclature code for GST
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (category_id) REFERENCES categories (id),
+                FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
+            );
+            
+            -- Inventory table
+            CREATE TABLE IF NOT EXISTS inventory (
+                id INTEGER PRIMARY KEY,
+                product_id INTEGER,
+                quantity INTEGER DEFAULT 0,
+                reorder_level INTEGER DEFAULT 10,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (product_id) REFERENCES products (id)
+            );
+            
+            -- Transactions table
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY,
+                type TEXT CHECK (type IN ('purchase', 'sale', 'adjustment')),
+                product_id INTEGER,
+                quantity INTEGER NOT NULL,
+                transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                notes TEXT,
+                FOREIGN KEY (product_id) REFERENCES products (id)
+            );
+            
+            -- Indexes for the foreign-key joins. The inventory index also carries
+            -- quantity and reorder_level, so stock lookups and the low-stock filter
+            -- are answered from the index alone (it doubles as the product_id index)
+            CREATE INDEX IF NOT EXISTS idx_inventory_lowstock ON inventory (product_id, quantity, reorder_level);
+            CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id);
+            CREATE INDEX IF NOT EXISTS idx_products_supplier ON products (supplier_id);
+            CREATE INDEX IF NOT EXISTS idx_transactions_product ON transactions (product_id);
+            ''')
+            
+            # Initialize with default categories for Indian market
+            default_categories = [
+                (1, "Groceries & Staples", "Rice, Dal, Flour, etc."),
+                (2, "Electronics", "Mobile phones, Laptops, Appliances"),
+                (3, "Clothing", "Men's, Women's and Children's apparel"),
+                (4, "Home & Kitchen", "Utensils, Cookware"),
+                (5, "Beauty & Personal Care", "Cosmetics, Toiletries"),
+                (6, "Stationery", "Books, Office supplies"),
+                (7, "Snacks & Beverages", "Biscuits, Soft drinks"),
+                (8, "Dairy Products", "Milk, Curd, Paneer"),
+                (9, "Groceries", ""),
+                (10, "Home Appliances", ""),
+                (11, "Mobile Accessories", ""),
+                (12, "Kitchen Items", ""),
+                (13, "Beauty Products", ""),
+                (14, "FMCG", ""),
+                (15, "Hardware", "")
+            ]
+            
+            # Insert default categories only into an empty table
+            self.cursor.execute("SELECT 1 FROM categories LIMIT 1")
+            if self.cursor.fetchone() is None:
+                self.cursor.executemany('''
+                INSERT OR IGNORE INTO categories (id, name, description) VALUES (?, ?, ?)
+                ''', default_categories)
+            
+            self._repair_foreign_keys()
+            
+            self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.conn.commit()
+        except BaseException:
+            # A failing statement stops the script with its BEGIN still open
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
     
+    def _analyze_if_needed(self):
+        """Gather planner statistics once the database holds products.
+        
+        PRAGMA optimize in close() only refreshes statistics for tables the
+        write connection itself queried, and most queries run on the read
+        pool. So the first startup that finds products but no statistics runs
+        a full ANALYZE; later ones leave the refresh to close().
+        """
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if self.cursor.fetchone() is not None:
+            return
+        self.cursor.execute("SELECT 1 FROM products LIMIT 1")
+        if self.cursor.fetchone() is not None:
+            self.cursor.execute("ANALYZE")
+    
+    def _repair_foreign_keys(self):
+        """Detach products from suppliers and categories that no longer exist.
+        
+        Older versions stored placeholder ids such as supplier_id=1 with no
+        matching row, which makes every later write to those products fail now
+        that foreign keys are enforced. Such references are set to NULL; the
+        product then shows as uncategorised or without a supplier.
+        """
+        self.cursor.execute("PRAGMA foreign_key_check")
+        violations = self.cursor.fetchall()
+        if not violations:
+            return
+        
+        for column, parent in (("supplier_id", "suppliers"), ("category_id", "categories")):
+            self.cursor.execute(f'''
+            UPDATE products SET {column} = NULL
+            WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {parent})
+            ''')
+        
+        others = {row[0] for row in violations} - {"products"}
+        if others:
+            print(f"Warning: dangling references left in {', '.join(sorted(others))}")
+    
+    def _schema_version(self):
+        """Return the schema version stamped by create_tables, 0 if never run."""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+    
+    @_synchronized
     def close(self):
         """Close database connection."""
+        # Connections lent out are closed by their borrowers on return; reads
+        # started after this point find the None marker and raise
+        with self._pool_lock:
+            self._closed = True
+            while not self._read_pool.empty():
+                conn = self._read_pool.get_nowait()
+                if conn is not None:
+                    conn.close()
+            self._read_pool.put(None)
         if self.conn:
+            try:
+                # Re-analyze the tables whose statistics have gone stale;
+                # main() calls close() once the window is closed
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"Error optimizing database: {e}")
             self.conn.close()
             print("Database connection closed.")
     
+    # Transaction helpers
+    @contextlib.contextmanager
+    def _write(self):
+        """Run the block as one write transaction, or as part of the enclosing bulk().
+        
+        A transaction started here is committed when the block finishes and
+        rolled back if it raises anything at all, so no exception can leave
+        it open. Inside bulk() the exception propagates to bulk() instead.
+        """
+        self._data_version += 1
+        if self._bulk_depth:
+            yield
+            return
+        # Take the write lock up front instead of on the first statement
+        self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+    
+    @contextlib.contextmanager
+    def bulk(self):
+        """Group several write calls into one transaction, committed once on exit.
+        
+        Usage:
+            with db.bulk():
+                db.add_product(...)
+                db.update_stock(...)
+        
+        The transaction is rolled back if the block raises. Nested bulk()
+        blocks join the outermost one.
+        """
+        with self._lock:
+            if self._bulk_depth:
+                self._bulk_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._bulk_depth -= 1
+                return
+            
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self._bulk_depth = 1
+            try:
+                yield self
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                # Lookups made inside the block may have cached rolled-back rows
+                self._data_version += 1
+                self._categories_cache = None
+                raise
+            finally:
+                self._bulk_depth = 0
+    
+    # Backup and restore methods
+    def backup_to(self, backup_file):
+        """Copy the database into a backup file using SQLite's online backup API.
+        
+        Reads through its own connection, so it can run on a worker thread
+        while the application keeps using the database.
+        
+        Args:
+            backup_file (str): Path of the backup file to write
+        """
+        source = sqlite3.connect(self.db_file)
+        dest = sqlite3.connect(backup_file)
+        try:
+            source.backup(dest, pages=self.BACKUP_STEP_PAGES)
+        finally:
+            dest.close()
+            source.close()
+    
+    def restore_from(self, backup_file):
+        """Replace the database contents with a backup file.
+        
+        Writes through its own connection and does not hold the instance
+        lock while copying, so reads through this instance keep working
+        during a restore on a worker thread. SQLite holds the write lock on
+        the database for the whole copy, however, so writes from other
+        connections wait and fail with "database is locked" after the busy
+        timeout; callers should not write until the restore returns. The
+        open connections see the restored data once the copy finishes, so
+        the application keeps running without reconnecting.
+        
+        Args:
+            backup_file (str): Path of the backup file to restore
+        """
+        source = sqlite3.connect(backup_file)
+        dest = sqlite3.connect(self.db_file)
+        converted = None
+        try:
+            # The backup API cannot change the page size of a WAL database,
+            # so a backup with another page size is rewritten to match first
+            page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+            if source.execute("PRAGMA page_size").fetchone()[0] != page_size:
+                converted = self._resize_pages(source, page_size)
+                source.close()
+                source = sqlite3.connect(converted)
+            source.backup(dest, pages=self.BACKUP_STEP_PAGES)
+        finally:
+            dest.close()
+            source.close()
+            if converted:
+                os.remove(converted)
+            with self._lock:
+                self._data_version += 1
+                self._categories_cache = None
+        
+        # A backup taken by an older version may lack tables or indexes and
+        # still carry dangling ids; create_tables adds the one and repairs
+        # the other, and stamps the current schema version
+        self.create_tables()
+    
+    @staticmethod
+    def _resize_pages(source, page_size):
+        """Copy a database into a temporary file that uses the given page size.
+        
+        Args:
+            source (sqlite3.Connection): Database to copy
+            page_size (int): Page size of the copy, in bytes
+        
+        Returns:
+            str: Path of the temporary file; the caller removes it
+        """
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        copy = sqlite3.connect(path)
+        try:
+            source.backup(copy)
+            # VACUUM only applies a new page size outside WAL mode
+            copy.execute("PRAGMA journal_mode=DELETE")
+            copy.execute(f"PRAGMA page_size = {int(page_size)}")
+            copy.execute("VACUUM")
+        except BaseException:
+            copy.close()
+            os.remove(path)
+            raise
+        copy.close()
+        return path
+    
     # Product management methods
+    @_write_method("adding product", None)
     def add_product(self, name, description, category_id, supplier_id, cost_price, 
                    selling_price, gst_percentage, hsn_code, initial_stock=0):
         """Add a new product to the database.
@@ -149,70 +607,86 @@ class InventoryDatabase:
         Returns:
             int: Product ID if successful, None otherwise
         """
-        try:
+        with self._write():
             # Insert product
-            self.cursor.execute('''
-            INSERT INTO products (name, description, category_id, supplier_id, 
-                                cost_price, selling_price, gst_percentage, hsn_code)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (name, description, category_id, supplier_id, cost_price, 
-                 selling_price, gst_percentage, hsn_code))
+            self.cursor.execute(_SQL_INSERT_PRODUCT, (name, description, category_id, supplier_id,
+                                                      cost_price, selling_price, gst_percentage, hsn_code))
             
             product_id = self.cursor.lastrowid
             
             # Initialize inventory
-            self.cursor.execute('''
-            INSERT INTO inventory (product_id, quantity)
-            VALUES (?, ?)
-            ''', (product_id, initial_stock))
+            self.cursor.execute(_SQL_INSERT_INVENTORY, (product_id, initial_stock, _utc_timestamp()))
             
             # Record as transaction if initial stock > 0
             if initial_stock > 0:
-                self.cursor.execute('''
-                INSERT INTO transactions (type, product_id, quantity, notes)
-                VALUES (?, ?, ?, ?)
-                ''', ('purchase', product_id, initial_stock, 'Initial stock'))
+                self.cursor.execute(_SQL_INSERT_TRANSACTION,
+                                    ('purchase', product_id, initial_stock, 'Initial stock'))
+        
+        return product_id
+    
+    @_write_method("adding products", None)
+    def add_products_bulk(self, products):
+        """Add many products, with their inventory and initial stock, in one transaction.
+        
+        Args:
+            products (iterable): Tuples of (name, description, category_id, supplier_id,
+                cost_price, selling_price, gst_percentage, hsn_code, initial_stock)
+        
+        Returns:
+            list: Product IDs in input order if successful, None otherwise
+        """
+        rows = [tuple(product) for product in products]
+        with self._write():
+            # The write lock is held, so the IDs after the current maximum are ours
+            self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM products")
+            first_id = self.cursor.fetchone()[0] + 1
+            product_ids = list(range(first_id, first_id + len(rows)))
             
-            self.conn.commit()
-            return product_id
-        except sqlite3.Error as e:
-            print(f"Error adding product: {e}")
-            self.conn.rollback()
-            return None
+            numbered = list(zip(product_ids, rows))
+            
+            self.cursor.executemany(_SQL_INSERT_PRODUCT_WITH_ID,
+                                    [(product_id,) + row[:8] for product_id, row in numbered])
+            
+            now = _utc_timestamp()
+            self.cursor.executemany(_SQL_INSERT_INVENTORY,
+                                    [(product_id, row[8], now) for product_id, row in numbered])
+            
+            self.cursor.executemany(_SQL_INSERT_TRANSACTION,
+                                    [('purchase', product_id, row[8], 'Initial stock')
+                                     for product_id, row in numbered if row[8] > 0])
+        
+        return product_ids
     
+    @_write_method("updating product", False)
     def update_product(self, product_id, **kwargs):
         """Update product details.
         
         Args:
             product_id (int): Product ID to update
-            **kwargs: Field-value pairs to update
+            **kwargs: Field-value pairs to update; any of the columns in
+                _PRODUCT_UPDATE_FIELDS. Only the fields passed are written
             
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Build update query dynamically based on provided fields
-            if not kwargs:
-                return False
-                
-            update_fields = []
-            values = []
-            
-            for field, value in kwargs.items():
-                update_fields.append(f"{field} = ?")
-                values.append(value)
-            
-            query = f"UPDATE products SET {', '.join(update_fields)} WHERE id = ?"
+        if not kwargs:
+            return False
+        unknown = set(kwargs).difference(_PRODUCT_UPDATE_FIELDS)
+        if unknown:
+            print(f"Error updating product: unknown fields {', '.join(sorted(unknown))}")
+            return False
+        
+        with self._write():
+            # Sorting the columns lets every call with the same fields share
+            # one statement, whatever order the keywords were passed in
+            fields = tuple(sorted(kwargs))
+            values = [kwargs[field] for field in fields]
             values.append(product_id)
             
-            self.cursor.execute(query, values)
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error updating product: {e}")
-            self.conn.rollback()
-            return False
+            self.cursor.execute(_update_product_sql(fields), values)
+        return True
     
+    @_write_method("deleting product", False)
     def delete_product(self, product_id):
         """Delete a product and its inventory records.
         
@@ -222,21 +696,17 @@ class InventoryDatabase:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
+        with self._write():
             # Delete from inventory first
             self.cursor.execute("DELETE FROM inventory WHERE product_id = ?", (product_id,))
             # Delete from transactions
             self.cursor.execute("DELETE FROM transactions WHERE product_id = ?", (product_id,))
             # Delete the product
             self.cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-            
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error deleting product: {e}")
-            self.conn.rollback()
-            return False
+        
+        return True
     
+    @_synchronized
     def get_product(self, product_id):
         """Get product details by ID.
         
@@ -247,75 +717,159 @@ class InventoryDatabase:
             dict: Product details or None if not found
         """
         try:
-            self.cursor.execute('''
-            SELECT p.id, p.name, p.description, p.category_id, c.name as category_name,
-                   p.supplier_id, s.name as supplier_name, p.cost_price, p.selling_price,
-                   p.gst_percentage, p.hsn_code, i.quantity
-            FROM products p
-            JOIN categories c ON p.category_id = c.id
-            LEFT JOIN suppliers s ON p.supplier_id = s.id
-            LEFT JOIN inventory i ON p.id = i.product_id
-            WHERE p.id = ?
-            ''', (product_id,))
-            
-            row = self.cursor.fetchone()
-            if row:
-                return {
-                    'id': row[0],
-                    'name': row[1],
-                    'description': row[2],
-                    'category_id': row[3],
-                    'category_name': row[4],
-                    'supplier_id': row[5],
-                    'supplier_name': row[6],
-                    'cost_price': row[7],
-                    'selling_price': row[8],
-                    'gst_percentage': row[9],
-                    'hsn_code': row[10],
-                    'quantity': row[11]
-                }
+            # Column names come from the SELECT aliases via sqlite3.Row
+            row = self._product_lookup(product_id, self._data_version)
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Error retrieving product: {e}")
             return None
+    
+    def get_product_lite(self, product_id):
+        """Get a product's own columns and stock level, without category or supplier names.
+        
+        Args:
+            product_id (int): Product ID
+        
+        Returns:
+            dict: Product details or None if not found
+        """
+        try:
+            with self._read_conn() as conn:
+                row = conn.execute(_SQL_SELECT_PRODUCT_LITE, (product_id,)).fetchone()
+                return dict(row) if row else None
         except sqlite3.Error as e:
             print(f"Error retrieving product: {e}")
             return None
     
+    def _load_product(self, product_id, data_version):
+        """Fetch one product row; memoized by _product_lookup.
+        
+        Args:
+            product_id (int): Product ID
+            data_version (int): Data version the row is cached under
+        
+        Returns:
+            sqlite3.Row: Product row or None if not found
+        """
+        self.cursor.execute(_SQL_SELECT_PRODUCT, (product_id,))
+        return self.cursor.fetchone()
+    
     def get_all_products(self):
         """Get all products with their current inventory levels.
         
         Returns:
-            list: List of product dictionaries
+            list: List of sqlite3.Row product records, indexable by column name
         """
         try:
-            self.cursor.execute('''
-            SELECT p.id, p.name, p.description, c.name as category_name,
-                   s.name as supplier_name, p.cost_price, p.selling_price,
-                   p.gst_percentage, i.quantity
-            FROM products p
-            JOIN categories c ON p.category_id = c.id
-            LEFT JOIN suppliers s ON p.supplier_id = s.id
-            LEFT JOIN inventory i ON p.id = i.product_id
-            ORDER BY p.name
-            ''')
-            
-            products = []
-            for row in self.cursor.fetchall():
-                products.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'description': row[2],
-                    'category': row[3],
-                    'supplier': row[4],
-                    'cost_price': row[5],
-                    'selling_price': row[6],
-                    'gst_percentage': row[7],
-                    'quantity': row[8]
-                })
-            return products
+            with self._read_conn() as conn:
+                cursor = conn.execute('''
+                SELECT p.id, p.name, p.description,
+                       COALESCE(NULLIF(c.name, ''), 'Uncategorized') as category,
+                       s.name as supplier, p.cost_price, p.selling_price,
+                       p.gst_percentage, i.quantity
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                LEFT JOIN suppliers s ON p.supplier_id = s.id
+                LEFT JOIN inventory i ON p.id = i.product_id
+                ORDER BY p.name
+                ''')
+                
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving products: {e}")
+            return []
+    
+    def get_product_list_rows(self):
+        """Get the rows shown in the products list.
+        
+        Rows are plain tuples of (id, name, category, selling_price, quantity,
+        reorder_level, gst_percentage), in the products treeview's column
+        order. They are fetched in full, so the read connection and its
+        snapshot are released before the caller starts inserting them.
+        
+        Returns:
+            list: Product rows ordered by name
+        """
+        try:
+            with self._read_conn() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute('''
+                SELECT p.id, p.name, COALESCE(NULLIF(c.name, ''), 'Uncategorized'),
+                       p.selling_price, COALESCE(i.quantity, 0),
+                       COALESCE(i.reorder_level, 10), p.gst_percentage
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                LEFT JOIN inventory i ON p.id = i.product_id
+                ORDER BY p.name
+                ''')
+                
+                return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error retrieving products: {e}")
             return []
     
+    def count_products(self):
+        """Get the number of products listed by get_all_products.
+        
+        Returns:
+            int: Product count
+        """
+        try:
+            with self._read_conn() as conn:
+                cursor = conn.execute("SELECT COUNT(*) FROM products")
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error counting products: {e}")
+            return 0
+    
+    def get_category_counts(self):
+        """Get the number of products in each category.
+        
+        Products without a category are counted under 'Uncategorized'.
+        
+        Returns:
+            list: List of (category_name, product_count) rows, largest first
+        """
+        try:
+            with self._read_conn() as conn:
+                cursor = conn.execute('''
+                SELECT COALESCE(NULLIF(c.name, ''), 'Uncategorized') AS category, COUNT(*)
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                GROUP BY category
+                ORDER BY 2 DESC
+                ''')
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving category counts: {e}")
+            return []
+    
+    def get_top_products_by_quantity(self, n=5):
+        """Get the products with the highest stock levels.
+        
+        Args:
+            n (int, optional): Number of products to return
+        
+        Returns:
+            list: List of (product_name, quantity) tuples
+        """
+        try:
+            with self._read_conn() as conn:
+                cursor = conn.execute('''
+                SELECT p.name, COALESCE(i.quantity, 0) AS quantity
+                FROM products p
+                LEFT JOIN inventory i ON p.id = i.product_id
+                ORDER BY quantity DESC
+                LIMIT ?
+                ''', (n,))
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving top products: {e}")
+            return []
+    
     # Inventory management methods
+    @_write_method("updating stock", False)
     def update_stock(self, product_id, quantity_change, transaction_type, notes=""):
         """Update stock level for a product.
         
@@ -328,45 +882,29 @@ class InventoryDatabase:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Get current quantity
-            self.cursor.execute("SELECT quantity FROM inventory WHERE product_id = ?", 
-                              (product_id,))
-            row = self.cursor.fetchone()
+        with self._write():
+            # Update existing inventory in one statement; the WHERE clause
+            # refuses changes that would take the stock below zero
+            now = _utc_timestamp()
+            self.cursor.execute(_SQL_UPDATE_STOCK, (quantity_change, now, product_id, quantity_change))
             
-            if row is None:
-                # Create inventory record if it doesn't exist
-                self.cursor.execute('''
-                INSERT INTO inventory (product_id, quantity, last_updated)
-                VALUES (?, ?, datetime('now'))
-                ''', (product_id, quantity_change))
-            else:
-                # Update existing inventory
-                current_quantity = row[0]
-                new_quantity = current_quantity + quantity_change
+            if self.cursor.rowcount == 0:
+                # Either there is no inventory record yet or the stock is too low
+                self.cursor.execute(_SQL_SELECT_STOCK, (product_id,))
+                row = self.cursor.fetchone()
                 
-                if new_quantity < 0:
-                    print(f"Error: Stock cannot be negative. Current: {current_quantity}, Change: {quantity_change}")
+                if row is not None:
+                    print(f"Error: Stock cannot be negative. Current: {row[0]}, Change: {quantity_change}")
                     return False
                 
-                self.cursor.execute('''
-                UPDATE inventory 
-                SET quantity = ?, last_updated = datetime('now')
-                WHERE product_id = ?
-                ''', (new_quantity, product_id))
+                # Create inventory record if it doesn't exist
+                self.cursor.execute(_SQL_INSERT_INVENTORY, (product_id, quantity_change, now))
             
             # Record transaction
-            self.cursor.execute('''
-            INSERT INTO transactions (type, product_id, quantity, notes)
-            VALUES (?, ?, ?, ?)
-            ''', (transaction_type, product_id, quantity_change, notes))
+            self.cursor.execute(_SQL_INSERT_TRANSACTION,
+                                (transaction_type, product_id, quantity_change, notes))
             
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error updating stock: {e}")
-            self.conn.rollback()
-            return False
+        return True
     
     def get_low_stock_products(self, threshold=None):
         """Get products with stock below their reorder level.
@@ -375,63 +913,72 @@ class InventoryDatabase:
             threshold (int, optional): Override default reorder level
             
         Returns:
-            list: List of low stock products
+            list: List of sqlite3.Row low stock records, indexable by column name
         """
         try:
-            if threshold is not None:
-                query = '''
-                SELECT p.id, p.name, i.quantity, i.reorder_level
-                FROM products p
-                JOIN inventory i ON p.id = i.product_id
-                WHERE i.quantity <= ?
-                ORDER BY i.quantity
-                '''
-                self.cursor.execute(query, (threshold,))
-            else:
-                query = '''
-                SELECT p.id, p.name, i.quantity, i.reorder_level
+            with self._read_conn() as conn:
+                if threshold is not None:
+                    query = '''
+                    SELECT p.id, p.name, i.quantity, i.reorder_level
+                    FROM products p
+                    JOIN inventory i ON p.id = i.product_id
+                    WHERE i.quantity <= ?
+                    ORDER BY i.quantity
+                    '''
+                    cursor = conn.execute(query, (threshold,))
+                else:
+                    query = '''
+                    SELECT p.id, p.name, i.quantity, i.reorder_level
+                    FROM products p
+                    JOIN inventory i ON p.id = i.product_id
+                    WHERE i.quantity <= i.reorder_level
+                    ORDER BY i.quantity
+                    '''
+                    cursor = conn.execute(query)
+                
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting low stock products: {e}")
+            return []
+    
+    def count_low_stock(self):
+        """Get the number of products at or below their reorder level.
+        
+        Returns:
+            int: Low stock product count
+        """
+        try:
+            with self._read_conn() as conn:
+                cursor = conn.execute('''
+                SELECT COUNT(*)
                 FROM products p
                 JOIN inventory i ON p.id = i.product_id
                 WHERE i.quantity <= i.reorder_level
-                ORDER BY i.quantity
-                '''
-                self.cursor.execute(query)
-            
-            low_stock = []
-            for row in self.cursor.fetchall():
-                low_stock.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'quantity': row[2],
-                    'reorder_level': row[3]
-                })
-            return low_stock
+                ''')
+                return cursor.fetchone()[0]
         except sqlite3.Error as e:
-            print(f"Error getting low stock products: {e}")
-            return []
+            print(f"Error counting low stock products: {e}")
+            return 0
     
     # Category management methods
+    @_synchronized
     def get_all_categories(self):
         """Get all product categories.
         
         Returns:
-            list: List of category dictionaries
+            list: List of sqlite3.Row category records, indexable by column name
         """
+        if self._categories_cache is not None:
+            return list(self._categories_cache)
         try:
             self.cursor.execute("SELECT id, name, description FROM categories ORDER BY name")
-            
-            categories = []
-            for row in self.cursor.fetchall():
-                categories.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'description': row[2]
-                })
-            return categories
+            self._categories_cache = tuple(self.cursor.fetchall())
+            return list(self._categories_cache)
         except sqlite3.Error as e:
             print(f"Error retrieving categories: {e}")
             return []
     
+    @_write_method("adding category", None)
     def add_category(self, name, description=""):
         """Add a new product category.
         
@@ -442,16 +989,12 @@ class InventoryDatabase:
         Returns:
             int: Category ID if successful, None otherwise
         """
-        try:
+        with self._write():
+            self._categories_cache = None
             self.cursor.execute('''
             INSERT INTO categories (name, description)
             VALUES (?, ?)
             ''', (name, description))
             
             category_id = self.cursor.lastrowid
-            self.conn.commit()
-            return category_id
-        except sqlite3.Error as e:
-            print(f"Error adding category: {e}")
-            self.conn.rollback()
-            return None
+        return category_id
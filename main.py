@@ -8,14 +8,13 @@ Initializes the database and launches the GUI application
 import os
 import sys
 import logging
-import tkinter as tk
-from tkinter import messagebox
+import logging.handlers
 import sqlite3
 from datetime import datetime
 
-# Import custom modules
+# Import custom modules; tkinter and the GUI module are imported where needed,
+# so the database is set up before any GUI code loads
 from inventory_manager import InventoryDatabase
-from gui_manager import InventoryManagementSystem
 
 # Configure logging
 def setup_logging():
@@ -26,13 +25,22 @@ def setup_logging():
     
     log_file = os.path.join(log_dir, f"inventory_app_{datetime.now().strftime('%Y%m%d')}.log")
     
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    # Buffer records and write them in batches; errors are flushed at once,
+    # and logging's exit hook flushes whatever is left on shutdown. The
+    # buffer hands records to the file handler, so that one needs the format
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(log_format))
+    handlers = [logging.handlers.MemoryHandler(256, target=file_handler)]
+    if __debug__:
+        # Console output is for development runs; python -O builds skip it
+        handlers.append(logging.StreamHandler(sys.stdout))
+    
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+        format=log_format,
+        handlers=handlers
     )
     return logging.getLogger('InventoryApp')
 
@@ -44,34 +52,27 @@ def initialize_database():
     db_exists = os.path.exists(db_file)
     
     try:
-        # Create database connection
-        db_manager = InventoryDatabase(db_file)
-        
         if not db_exists:
             logger.info("Database not found. Creating new database...")
-            # Initialize database tables
-            db_manager.create_tables()
+        
+        # Create database connection; tables and default categories are
+        # created by InventoryDatabase itself, and skipped when already current
+        db_manager = InventoryDatabase(db_file, initialize=not db_exists)
+        
+        if not db_exists:
             logger.info("Database initialized successfully.")
-            
-            # Add some default categories for Indian market
-            default_categories = [
-                "Groceries", "Electronics", "Clothing", "Stationery", 
-                "Home Appliances", "Mobile Accessories", "Kitchen Items",
-                "Beauty Products", "FMCG", "Hardware"
-            ]
-            for category in default_categories:
-                db_manager.add_category(category)
-            logger.info("Default categories added.")
         else:
             logger.info("Database already exists.")
         
         return db_manager
     except sqlite3.Error as e:
         logger.error(f"Database error: {e}")
+        from tkinter import messagebox
         messagebox.showerror("Database Error", f"Failed to initialize database: {e}")
         sys.exit(1)
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+        from tkinter import messagebox
         messagebox.showerror("Error", f"An unexpected error occurred: {e}")
         sys.exit(1)
 
@@ -82,6 +83,10 @@ def main():
         # Initialize database
         db_manager = initialize_database()
         
+        # Load the GUI only once the database is ready
+        import tkinter as tk
+        from gui_manager import InventoryManagementSystem
+        
         # Create root window
         root = tk.Tk()
         root.title("Inventory Management System")
@@ -106,8 +111,12 @@ def main():
         # Start the main loop
         root.mainloop()
         
+        # Closing runs PRAGMA optimize, which keeps the planner statistics fresh
+        db_manager.close()
+    
     except Exception as e:
         logger.critical(f"Application failed to start: {e}", exc_info=True)
+        from tkinter import messagebox
         messagebox.showerror("Critical Error", f"Application failed to start: {e}")
         sys.exit(1)
 